@@ -4,18 +4,26 @@ Analyzes Latin texts by looking up words on navigium.de
 """
 
 from flask import Flask, render_template, request, jsonify
-from navigium_scraper import lookup_word, analyze_text, preprocess_text, lookup_word_all_meanings
-import hashlib
+from navigium_scraper import lookup_word, analyze_text, preprocess_text, tokenize, get_lemma_keys_many
+import xxhash
+import concurrent.futures
 
 app = Flask(__name__)
 
 # Serverseitiger Cache für die letzte(n) Analyse(n)
-# Key: SHA256 Hash des Textes
+# Key: xxh3-128 Hash des Textes
 # Value: Analyse-Ergebnisse (dict)
 ANALYSIS_CACHE = {}
 
-def get_text_hash(text):
-    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+def get_text_hash(text_bytes: bytes) -> str:
+    """Cache-Key für einen (bereits UTF-8-kodierten) Text."""
+    return xxhash.xxh3_128_hexdigest(text_bytes)
+
+
+@app.errorhandler(concurrent.futures.TimeoutError)
+def handle_scraper_timeout(error):
+    """Antwortet mit 504, wenn der Scraper-Loop nicht rechtzeitig fertig wird."""
+    return jsonify({'error': 'Zeitüberschreitung bei der Abfrage von navigium.de'}), 504
 
 
 @app.route('/')
@@ -49,15 +57,16 @@ def api_analyze():
     if not data or 'text' not in data:
         return jsonify({'error': 'Kein Text angegeben'}), 400
     
+    # preprocess_text liefert den Text bereits getrimmt
     text = preprocess_text(data['text'])
-    if not text.strip():
+    if not text:
         return jsonify({'error': 'Text ist leer'}), 400
     
-    text_hash = get_text_hash(text)
+    text_hash = get_text_hash(text.encode('utf-8'))
     if text_hash in ANALYSIS_CACHE:
         results = ANALYSIS_CACHE[text_hash]
     else:
-        results = analyze_text(text)
+        results = analyze_text(text, preprocessed=True)
         ANALYSIS_CACHE[text_hash] = results
     
     return jsonify({
@@ -78,88 +87,36 @@ def api_word_frequency():
         text: Der zu durchsuchende Text
         search_words: Liste von Suchwörtern
     """
-    import re
-    from navigium_scraper import lookup_word_all_meanings, preprocess_text
-    
     data = request.get_json()
     if not data or 'text' not in data or 'search_words' not in data:
         return jsonify({'error': 'Text und Suchwörter erforderlich'}), 400
     
     text = preprocess_text(data['text'])
     search_words = data['search_words']
-    text_hash = get_text_hash(text)
-    
-    # Prüfe ob wir Analyse-Ergebnisse für diesen Text haben
-    cached_analysis = ANALYSIS_CACHE.get(text_hash)
-    
-    # Hilfsfunktion: Diakritische Zeichen entfernen
-    def normalize(s):
-        import re
-        return re.sub(r'[āēīōūĀĒĪŌŪ]', 
-            lambda m: {'ā':'a','ē':'e','ī':'i','ō':'o','ū':'u',
-                       'Ā':'A','Ē':'E','Ī':'I','Ō':'O','Ū':'U'}[m.group()], 
-            s.lower())
-    
-    # Hilfsfunktion: Lemmas für ein Wort ermitteln
-    def get_lemmas(word):
-        # Falls wir Ergebnisse aus der Vollanalyse haben, nutze diese!
-        if cached_analysis:
-            for item in cached_analysis:
-                if item['word'] == word:
-                    lemmas = set()
-                    for m in item.get('meanings', []):
-                        if m.get('lemma'):
-                            lemmas.add(normalize(m['lemma'].split()[0]))
-                    lemmas.add(normalize(word))
-                    return lemmas
-
-        lemmas = set()
-        meanings = lookup_word_all_meanings(word.lower())
-        for meaning in meanings:
-            if meaning.get('lemma'):
-                # Extrahiere erstes Wort aus dem Lemma (z.B. "arma -ōrum" -> "arma")
-                lemma_first = meaning['lemma'].split()[0]
-                lemmas.add(normalize(lemma_first))
-        # Auch das Wort selbst hinzufügen
-        lemmas.add(normalize(word))
-        return lemmas
     
     # Text in Wörter aufteilen
-    import re
-    words_in_text = re.findall(r'[a-zA-ZäöüÄÖÜāēīōūĀĒĪŌŪ]+', text.lower())
+    words_in_text = tokenize(text)
     total_words = len(words_in_text)
     
-    # Cache für Wort-Lemmas (verwende Vollanalyse falls vorhanden)
-    text_word_lemmas_cache = {}
-    if cached_analysis:
-        for item in cached_analysis:
-            w = item['word']
-            ls = set()
-            for m in item.get('meanings', []):
-                if m.get('lemma'):
-                    ls.add(normalize(m['lemma'].split()[0]))
-            ls.add(normalize(w))
-            text_word_lemmas_cache[w] = ls
+    # Grundformen für jedes vorkommende Wort und jedes Suchwort nur einmal ermitteln;
+    # noch unbekannte Wörter werden dabei nebenläufig nachgeschlagen
+    lemma_keys = get_lemma_keys_many(set(words_in_text).union(search_words))
+    
+    # Invertierter Index: Grundform -> Positionen im Text (1-basiert)
+    lemma_index = {}
+    for i, text_word in enumerate(words_in_text, 1):
+        for lemma in lemma_keys[text_word]:
+            lemma_index.setdefault(lemma, []).append(i)
     
     # Für jedes Suchwort: Grundformen finden und Positionen ermitteln
     word_data = []
     
     for search_word in search_words:
         # Grundform(en) des Suchworts finden
-        search_lemmas = get_lemmas(search_word)
+        search_lemmas = lemma_keys[search_word.lower()]
         
-        # Positionen finden wo ein Textwort dieselbe Grundform hat
-        positions = []
-        for i, text_word in enumerate(words_in_text):
-            # Lemmas für dieses Textwort ermitteln (mit Cache)
-            if text_word not in text_word_lemmas_cache:
-                text_word_lemmas_cache[text_word] = get_lemmas(text_word)
-            
-            text_lemmas = text_word_lemmas_cache[text_word]
-            
-            # Prüfen ob es eine Überschneidung gibt
-            if search_lemmas & text_lemmas:  # Schnittmenge
-                positions.append(i + 1)  # 1-basierte Position
+        # Positionen aller Textwörter mit derselben Grundform
+        positions = sorted({pos for lemma in search_lemmas for pos in lemma_index.get(lemma, ())})
         
         word_data.append({
             'search_word': search_word,
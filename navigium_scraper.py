@@ -3,58 +3,280 @@ Navigium.de Scraper Module
 Extracts Latin word information (lemma, grammar, translation) from navigium.de
 """
 
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import atexit
+import concurrent.futures
+import functools
+import threading
+import aiohttp
+from aiohttp_client_cache import CachedSession, SQLiteBackend
+from selectolax.lexbor import LexborHTMLParser
 import re
-import json
+import orjson
 import os
-from typing import List
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
+import sqlite3
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Dict, FrozenSet, Iterable, List, Optional
 
 BASE_URL = "https://www.navigium.de/latein-woerterbuch"
 
-# Globale Session für Connection Pooling
-scraper_session = requests.Session()
-adapter = HTTPAdapter(pool_connections=50, pool_maxsize=100)
-scraper_session.mount("http://", adapter)
-scraper_session.mount("https://", adapter)
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+}
 
-# Cache-Datei für persistentes Caching
-CACHE_FILE = os.path.join(os.path.dirname(__file__), '.word_cache.json')
+# Vorkompilierte Muster und Übersetzungstabellen für die Textverarbeitung
+_UNICODE_REPLACE_TABLE = str.maketrans({
+    '\u2018': "'", '\u2019': "'",  # Curly quotes
+    '\u201c': '"', '\u201d': '"',
+    '\u2014': '-', '\u2013': '-',  # Dashes
+    '\u00a0': ' ',  # Non-breaking space
+    '\u2026': '...',  # Ellipsis
+})
+_CONTROL_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]')
+_WS_RE = re.compile(r'\s+')
+_WORD_RE = re.compile(r'[a-zA-ZäöüÄÖÜāēīōūĀĒĪŌŪ]+')
+_DIACRITIC_TABLE = str.maketrans('āēīōūĀĒĪŌŪ', 'aeiouAEIOU')
 
-# In-Memory Cache (wird beim Start aus Datei geladen)
-word_cache = {}
+# HTML-Cache auf Platte (kalte Schicht unter dem geparsten word_cache)
+HTTP_CACHE_FILE = os.path.join(os.path.dirname(__file__), '.nav_http_cache.sqlite')
+HTTP_CACHE_EXPIRE = timedelta(days=30)
 
-def load_cache():
-    """Lädt den Cache aus der JSON-Datei."""
-    global word_cache
-    try:
-        if os.path.exists(CACHE_FILE):
-            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-                word_cache = json.load(f)
-    except (json.JSONDecodeError, IOError):
-        word_cache = {}
-
-def save_cache():
-    """Speichert den Cache in die JSON-Datei."""
+# Überschrift des Bereichs mit den echten Formen (vs. "Phrasen und Redewendungen")
+FORMS_HEADER = 'lat. Formen'
+
+# Maximale Anzahl gleichzeitiger Anfragen an navigium.de (Rate-Limiting)
+MAX_CONCURRENT_REQUESTS = 30
+
+# Wiederholungen bei vorübergehenden Fehlern (Verbindung, Timeout, 429/5xx)
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.3
+RETRY_MAX_DELAY = 5.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Maximale Wartezeit (s) auf eine Coroutine im Scraper-Loop, damit ein
+# hängender Loop keinen Flask-Worker dauerhaft blockiert
+RUN_TIMEOUT = 300
+
+# Eigener Event-Loop in einem Hintergrund-Thread: Flask bleibt synchron,
+# Session und Connection Pool überleben aber über mehrere Requests hinweg.
+# Er wird erst beim ersten Aufruf im jeweiligen Prozess gestartet, da Threads
+# einen fork (z.B. gunicorn --preload) nicht überleben.
+_loop = None
+_loop_lock = threading.Lock()
+
+# Globale Session für Connection Pooling (wird im Loop-Thread angelegt)
+_session = None
+_semaphore = None
+
+# Laufende Abfragen (Cache-Key -> Task), nur im Scraper-Loop verwendet
+_inflight = {}
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Startet den Scraper-Loop im aktuellen Prozess, falls noch nicht geschehen."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='navigium-loop', daemon=True).start()
+        return _loop
+
+
+def _reset_after_fork():
+    """Im Kindprozess: Loop, Session und laufende Abfragen des Elternprozesses verwerfen."""
+    global _loop, _loop_lock, _session, _semaphore, _inflight
+    _loop = None
+    _loop_lock = threading.Lock()
+    _session = None
+    _semaphore = None
+    _inflight = {}
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _run(coro):
+    """
+    Führt eine Coroutine auf dem Scraper-Loop aus und wartet auf das Ergebnis.
+    Nach RUN_TIMEOUT Sekunden wird sie abgebrochen und TimeoutError geworfen.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
     try:
-        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(word_cache, f, ensure_ascii=False, indent=2)
-    except IOError:
-        pass
+        return future.result(timeout=RUN_TIMEOUT)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Legt Session und Semaphore beim ersten Aufruf im Scraper-Loop an."""
+    global _session, _semaphore
+    if _session is None:
+        connector = aiohttp.TCPConnector(limit=100, limit_per_host=30, keepalive_timeout=30)
+        cache = SQLiteBackend(
+            cache_name=HTTP_CACHE_FILE,
+            expire_after=HTTP_CACHE_EXPIRE,
+            allowed_codes=(200,)
+        )
+        _session = CachedSession(
+            cache=cache,
+            connector=connector,
+            headers=HEADERS,
+            timeout=aiohttp.ClientTimeout(total=10)
+        )
+        _semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    return _session
+
+
+def _shutdown():
+    """Schließt die Session und beendet den Scraper-Loop beim Programmende."""
+    if _loop is None:
+        return
+    if _session is not None:
+        asyncio.run_coroutine_threadsafe(_session.close(), _loop).result(timeout=5)
+    _loop.call_soon_threadsafe(_loop.stop)
 
-# Cache beim Modulstart laden
-load_cache()
+
+atexit.register(_shutdown)
+
+
+# Cache-Datenbank für persistentes Caching
+CACHE_FILE = os.path.join(os.path.dirname(__file__), '.word_cache.sqlite')
+
+# Früheres Cache-Format, wird beim ersten Start einmalig übernommen
+LEGACY_JSON_FILE = os.path.join(os.path.dirname(__file__), '.word_cache.json')
+
+
+class CacheDB:
+    """
+    Persistenter Wort-Cache in SQLite (WAL-Modus).
+    Jeder Schreibzugriff ist sofort dauerhaft; mehrere Prozesse
+    (z.B. Gunicorn-Worker) können sich dieselbe Datei teilen. Die Verbindung
+    wird pro Prozess erst beim ersten Zugriff geöffnet, auch nach einem fork.
+    Häufig gelesene Einträge werden zusätzlich im Speicher gehalten.
+    """
+    
+    def __init__(self, path: str, hot_size: int = 4096):
+        self._path = path
+        self._conn = None
+        # Vom Elternprozess geerbte Verbindungen: weder benutzen noch schließen
+        # (beides ist nach fork unzulässig), nur vor der Garbage Collection bewahren
+        self._inherited_conns = []
+        self._lock = threading.Lock()
+        self._hot = OrderedDict()
+        self._hot_size = hot_size
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+    
+    def _after_fork(self):
+        """Im Kindprozess: Verbindung des Elternprozesses verwerfen, neue bei Bedarf öffnen."""
+        if self._conn is not None:
+            self._inherited_conns.append(self._conn)
+        self._conn = None
+        self._lock = threading.Lock()
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Öffnet die Verbindung beim ersten Zugriff im aktuellen Prozess. Lock muss gehalten werden."""
+        if self._conn is None:
+            conn = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL)')
+            self._conn = conn
+        return self._conn
+    
+    def _remember(self, key: str, value):
+        """Legt einen Eintrag in den In-Memory-Teil (LRU) ab. Lock muss gehalten werden."""
+        self._hot[key] = value
+        self._hot.move_to_end(key)
+        if len(self._hot) > self._hot_size:
+            self._hot.popitem(last=False)
+    
+    def get(self, key: str, default=None):
+        """Liefert den Eintrag zu key oder default, falls er nicht existiert."""
+        with self._lock:
+            if key in self._hot:
+                self._hot.move_to_end(key)
+                return self._hot[key]
+            row = self._connection().execute('SELECT value FROM cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return default
+            value = orjson.loads(row[0])
+            self._remember(key, value)
+            return value
+    
+    def set(self, key: str, value):
+        """Schreibt einen Eintrag (sofort dauerhaft)."""
+        with self._lock:
+            self._connection().execute(
+                'INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)',
+                (key, orjson.dumps(value))
+            )
+            self._remember(key, value)
+    
+    def legacy_imported(self) -> bool:
+        """Ob die alte Cache-Datei bereits übernommen wurde (PRAGMA user_version)."""
+        with self._lock:
+            return self._connection().execute('PRAGMA user_version').fetchone()[0] >= 1
+    
+    def import_legacy(self, entries: dict):
+        """
+        Übernimmt Einträge aus der alten Cache-Datei in einer einzigen Transaktion.
+        Die Übernahme gilt erst nach dem COMMIT als erledigt; bei einem Fehler wird
+        zurückgerollt und beim nächsten Start erneut versucht. Bereits vorhandene
+        Einträge haben Vorrang vor den alten.
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute('BEGIN')
+            try:
+                conn.executemany(
+                    'INSERT OR IGNORE INTO cache (key, value) VALUES (?, ?)',
+                    ((key, orjson.dumps(value)) for key, value in entries.items())
+                )
+                conn.execute('PRAGMA user_version = 1')
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+
+def _read_legacy_cache() -> dict:
+    """
+    Liest den Cache aus der früheren JSON-Datei.
+    Lese- und Formatfehler werden an den Aufrufer weitergegeben.
+    """
+    if not os.path.exists(LEGACY_JSON_FILE):
+        return {}
+    with open(LEGACY_JSON_FILE, 'rb') as f:
+        entries = orjson.loads(f.read())
+    # Gültiges JSON, aber kein Objekt: wie bisher mit leerem Cache starten
+    return entries if isinstance(entries, dict) else {}
+
+
+def load_cache() -> CacheDB:
+    """Öffnet die Cache-Datenbank und übernimmt beim ersten Start die alte Cache-Datei."""
+    cache = CacheDB(CACHE_FILE)
+    if not cache.legacy_imported():
+        try:
+            cache.import_legacy(_read_legacy_cache())
+        except (orjson.JSONDecodeError, IOError, KeyError, sqlite3.Error):
+            # Nicht als übernommen markiert - beim nächsten Start erneuter Versuch
+            pass
+    return cache
+
+
+# Cache beim Modulstart öffnen
+word_cache = load_cache()
 
 
 def clean_text(text: str) -> str:
     """Bereinigt Text von überflüssigen Leerzeichen und Zeilenumbrüchen."""
     if not text:
         return ""
-    return re.sub(r'\s+', ' ', text).strip()
+    return _WS_RE.sub(' ', text).strip()
 
 
 def preprocess_text(text: str) -> str:
@@ -68,33 +290,64 @@ def preprocess_text(text: str) -> str:
         return ""
     
     # Ersetze häufige Unicode-Varianten
-    replacements = {
-        '\u2018': "'", '\u2019': "'",  # Curly quotes
-        '\u201c': '"', '\u201d': '"',
-        '\u2014': '-', '\u2013': '-',  # Dashes
-        '\u00a0': ' ',  # Non-breaking space
-        '\u2026': '...',  # Ellipsis
-    }
-    for old, new in replacements.items():
-        text = text.replace(old, new)
+    text = text.translate(_UNICODE_REPLACE_TABLE)
     
-    # Entferne alle nicht-druckbaren Zeichen
-    text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', text)
-    
-    # Normalisiere Leerzeichen
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    return text
+    # Entferne alle nicht-druckbaren Zeichen und normalisiere Leerzeichen
+    return _WS_RE.sub(' ', _CONTROL_RE.sub('', text)).strip()
 
 
-def fetch_page(url: str) -> BeautifulSoup:
-    """Holt eine Seite und gibt ein BeautifulSoup-Objekt zurück."""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-    }
-    response = scraper_session.get(url, headers=headers, timeout=10)
-    response.raise_for_status()
-    return BeautifulSoup(response.text, 'lxml')
+def tokenize(text: str) -> List[str]:
+    """Zerlegt Text in kleingeschriebene Wörter (inkl. Umlaute und Längenzeichen)."""
+    return _WORD_RE.findall(text.lower())
+
+
+def normalize(s: str) -> str:
+    """Kleinschreibung und Entfernen der Längenzeichen (ā -> a)."""
+    return s.lower().translate(_DIACRITIC_TABLE)
+
+
+def lemma_key(lemma: Optional[str]) -> Optional[str]:
+    """Normalisierte Grundform eines Lemmas (z.B. "arma -ōrum" -> "arma")."""
+    return normalize(lemma.split()[0]) if lemma else None
+
+
+def _retry_delay(attempt: int, retry_after: Optional[str]) -> float:
+    """Wartezeit vor dem nächsten Versuch (ein Retry-After-Header hat Vorrang)."""
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), RETRY_MAX_DELAY)
+    return RETRY_BACKOFF * 2 ** attempt
+
+
+async def fetch_page(url: str) -> LexborHTMLParser:
+    """
+    Holt eine Seite und gibt den geparsten HTML-Baum zurück.
+    Vorübergehende Fehler (Verbindung, Timeout, 429/5xx) werden mit
+    exponentiellem Backoff wiederholt. Eine 404-Seite wird normal geparst,
+    damit das Wort als "nicht gefunden" gecacht wird statt als Fehler.
+    """
+    session = await _get_session()
+    for attempt in range(RETRY_TOTAL + 1):
+        html = None
+        retry_after = None
+        try:
+            async with _semaphore:
+                async with session.get(url) as response:
+                    if response.status in RETRY_STATUSES and attempt < RETRY_TOTAL:
+                        retry_after = response.headers.get('Retry-After')
+                    else:
+                        if response.status != 404:
+                            response.raise_for_status()
+                        # Rohe Bytes direkt an den Parser geben (kein Umweg über str)
+                        html = await response.read()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == RETRY_TOTAL:
+                raise
+        
+        if html is not None:
+            return LexborHTMLParser(html)
+        
+        # Außerhalb der Semaphore warten, damit andere Abfragen weiterlaufen
+        await asyncio.sleep(_retry_delay(attempt, retry_after))
 
 
 def parse_result_container(container, word: str, nr: int) -> dict:
@@ -109,61 +362,67 @@ def parse_result_container(container, word: str, nr: int) -> dict:
         'word_form': word,
         'nr': nr,
         'lemma': None,
+        'lemma_key': None,  # normalisierte Grundform für den Wortvergleich
         'grammar': None,
         'translation': None,
         'found': False,
         'word_matches': False  # True nur wenn u-Tag exakt übereinstimmt
     }
     
-    inner = container.find('div', class_='innen')
+    inner = container.css_first('div.innen')
     if not inner:
         return result
     
     # Lemma extrahieren aus div.lemma > span
-    lemma_div = inner.find('div', class_='lemma')
+    lemma_div = inner.css_first('div.lemma')
     if lemma_div:
-        lemma_span = lemma_div.find('span')
+        lemma_span = lemma_div.css_first('span')
         if lemma_span:
-            result['lemma'] = clean_text(lemma_span.get_text())
+            result['lemma'] = clean_text(lemma_span.text())
             result['found'] = True
         # Auch die Wortart hinzufügen, falls vorhanden
-        wortart = lemma_div.find('i', class_='wortart')
+        wortart = lemma_div.css_first('i.wortart')
         if wortart and result['lemma']:
-            result['lemma'] += ' ' + clean_text(wortart.get_text())
+            result['lemma'] += ' ' + clean_text(wortart.text())
+        result['lemma_key'] = lemma_key(result['lemma'])
     
     # Grammatik extrahieren - suche nach dem div mit dem unterstrichenen Wort
     # Das u-Tag enthält die EXAKTE Wortform die zu diesem Lemma gehört
     word_lower = word.lower()
     
-    for div in inner.find_all('div'):
-        u_tag = div.find('u')
-        if u_tag:
-            # Das unterstrichene Wort ist DIE Form die zu diesem Lemma gehört
-            underlined_word = clean_text(u_tag.get_text()).lower()
-            
-            # NUR wenn das unterstrichene Wort EXAKT dem Suchwort entspricht
-            # wird dieser Eintrag als gültige Form betrachtet
-            if underlined_word == word_lower:
-                result['word_matches'] = True
-            
-            # Das Format ist normalerweise: "word: Grammar Info"
-            text = clean_text(div.get_text())
-            if ':' in text:
-                grammar_part = text.split(':', 1)[1].strip()
-                result['grammar'] = grammar_part
-            break
+    # Erstes div unterhalb von div.innen (in Dokumentreihenfolge), das ein u-Tag
+    # enthält. css_first prüft auch den Knoten selbst, daher der Nachfahren-Selektor
+    # ab container - sonst würde immer div.innen selbst gefunden.
+    div = container.css_first('div.innen div:has(u)')
+    if div is not None:
+        u_tag = div.css_first('u')
+        
+        # Das unterstrichene Wort ist DIE Form die zu diesem Lemma gehört
+        underlined_word = clean_text(u_tag.text()).lower()
+        
+        # NUR wenn das unterstrichene Wort EXAKT dem Suchwort entspricht
+        # wird dieser Eintrag als gültige Form betrachtet
+        if underlined_word == word_lower:
+            result['word_matches'] = True
+        
+        # Das Format ist normalerweise: "word: Grammar Info"
+        text = clean_text(div.text())
+        if ':' in text:
+            grammar_part = text.split(':', 1)[1].strip()
+            result['grammar'] = grammar_part
     
     # KEIN Fallback mehr! Nur exakte u-Tag Übereinstimmung zählt.
     # Einträge in Beispielsätzen werden so korrekt ausgeschlossen.
     
     # Übersetzungen extrahieren aus ol > li > .bedeutung
-    ol = inner.find('ol')
+    ol = inner.css_first('ol')
     if ol:
         meanings = []
-        for li in ol.find_all('li')[:5]:  # Maximal 5 Bedeutungen
-            bedeutung = li.find(class_='bedeutung')
+        for li in ol.css('li')[:5]:  # Maximal 5 Bedeutungen
+            # 'li ' im Selektor: css_first prüft sonst auch das li selbst
+            bedeutung = li.css_first('li .bedeutung')
             if bedeutung:
-                text = clean_text(bedeutung.get_text())
+                text = clean_text(bedeutung.text())
                 if text:
                     meanings.append(text)
         if meanings:
@@ -171,7 +430,7 @@ def parse_result_container(container, word: str, nr: int) -> dict:
     
     # Falls keine strukturierten Bedeutungen, versuche einfachen Text-Extrakt
     if not result['translation']:
-        text = clean_text(inner.get_text())
+        text = clean_text(inner.text())
         # Suche nach typischen Übersetzungsmustern
         lines = text.split('\n')
         for line in lines:
@@ -183,7 +442,7 @@ def parse_result_container(container, word: str, nr: int) -> dict:
     return result
 
 
-def lookup_word(word: str, nr: int = 1) -> dict:
+async def lookup_word_async(word: str, nr: int = 1) -> dict:
     """
     Schlägt ein lateinisches Wort auf navigium.de nach.
     
@@ -195,16 +454,17 @@ def lookup_word(word: str, nr: int = 1) -> dict:
         Dictionary mit lemma, grammar, translation, word_form
     """
     cache_key = f"{word.lower()}_{nr}"
-    if cache_key in word_cache:
-        return word_cache[cache_key]
+    cached = word_cache.get(cache_key)
+    if cached is not None:
+        return cached
     
     url = f"{BASE_URL}/{word}?wb=gross&nr={nr}"
     
     try:
-        soup = fetch_page(url)
+        tree = await fetch_page(url)
         
         # Suche nach allen Ergebnis-Containern
-        containers = soup.find_all('div', class_='umgebend')
+        containers = tree.css('div.umgebend')
         
         if containers:
             # Bei nr-Parameter: Wenn mehrere vorhanden, zeige die entsprechende
@@ -232,6 +492,7 @@ def lookup_word(word: str, nr: int = 1) -> dict:
                 'word_form': word,
                 'nr': nr,
                 'lemma': None,
+                'lemma_key': None,
                 'grammar': None,
                 'translation': None,
                 'alternatives': [],
@@ -240,7 +501,7 @@ def lookup_word(word: str, nr: int = 1) -> dict:
             }
             
             # Suche in der gesamten Seite nach Informationen
-            result_text = soup.get_text()
+            result_text = tree.root.text()
             
             # Grammatik-Pattern
             grammar_patterns = [
@@ -255,14 +516,15 @@ def lookup_word(word: str, nr: int = 1) -> dict:
                     result['found'] = True
                     break
         
-        word_cache[cache_key] = result
+        word_cache.set(cache_key, result)
         return result
         
-    except requests.RequestException as e:
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         return {
             'word_form': word,
             'nr': nr,
             'lemma': None,
+            'lemma_key': None,
             'grammar': None,
             'translation': None,
             'alternatives': [],
@@ -272,7 +534,12 @@ def lookup_word(word: str, nr: int = 1) -> dict:
         }
 
 
-def lookup_word_all_meanings(word: str) -> List[dict]:
+def lookup_word(word: str, nr: int = 1) -> dict:
+    """Synchrone Variante von lookup_word_async (z.B. für Flask-Routen)."""
+    return _run(lookup_word_async(word, nr))
+
+
+async def lookup_word_all_meanings_async(word: str) -> List[dict]:
     """
     Schlägt ein lateinisches Wort nach und holt ALLE möglichen Bedeutungen.
     
@@ -286,45 +553,67 @@ def lookup_word_all_meanings(word: str) -> List[dict]:
         Liste aller möglichen Bedeutungen des Wortes (nur echte Formen)
         Leere Liste wenn keine Formen gefunden wurden
     """
-    url = f"{BASE_URL}/{word}?wb=gross"
-    
     # Cache-Check
     cache_key = f"all_{word}"
-    if cache_key in word_cache:
-        return word_cache[cache_key]
+    cached = word_cache.get(cache_key)
+    if cached is not None:
+        # Ältere Einträge ohne lemma_key einmalig nachrüsten
+        if any('lemma_key' not in meaning for meaning in cached):
+            for meaning in cached:
+                meaning['lemma_key'] = lemma_key(meaning.get('lemma'))
+            word_cache.set(cache_key, cached)
+        return cached
+    
+    # Läuft bereits eine Abfrage für dieses Wort (z.B. aus einem parallelen
+    # Request), wird auf deren Ergebnis gewartet statt erneut anzufragen
+    task = _inflight.get(cache_key)
+    if task is None:
+        task = asyncio.ensure_future(_scrape_all_meanings(word, cache_key))
+        _inflight[cache_key] = task
+        task.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+    
+    # shield: Abbruch eines Wartenden bricht die gemeinsame Abfrage nicht ab
+    return await asyncio.shield(task)
+
+
+async def _scrape_all_meanings(word: str, cache_key: str) -> List[dict]:
+    """Holt und parst die Formen-Seite eines Wortes (ohne Cache-Check)."""
+    url = f"{BASE_URL}/{word}?wb=gross"
     
     try:
-        soup = fetch_page(url)
+        tree = await fetch_page(url)
         
         # Finde alle h3-Überschriften mit Klasse "ergebnis"
         # Diese trennen die Bereiche "lat. Formen" vs "Phrasen und Redewendungen"
-        h3_headers = soup.find_all('h3', class_='ergebnis')
+        h3_headers = tree.css('h3.ergebnis')
         
         # Sammle nur Container die zum "Formen"-Bereich gehören
         forms_containers = []
         
         for h3 in h3_headers:
-            header_text = clean_text(h3.get_text())
-            
             # Nur den "lat. Formen" Bereich verarbeiten
-            if 'lat. Formen' in header_text:
-                # Alle nachfolgenden Geschwister-Elemente durchgehen
-                # bis zum nächsten h3 oder Ende
-                sibling = h3.next_sibling
-                while sibling:
-                    # Prüfen ob es ein Element ist (nicht nur Text)
-                    if hasattr(sibling, 'name'):
-                        # Stoppen wenn wir einen neuen h3 Header erreichen
-                        if sibling.name == 'h3':
-                            break
-                        # Container mit Klasse "umgebend" sammeln
-                        if sibling.name == 'div' and 'umgebend' in sibling.get('class', []):
-                            forms_containers.append(sibling)
-                    sibling = sibling.next_sibling
+            if FORMS_HEADER not in clean_text(h3.text()):
+                continue
+            
+            # Alle nachfolgenden Geschwister-Elemente durchgehen
+            # bis zum nächsten h3 oder Ende
+            sibling = h3.next
+            while sibling is not None:
+                # Stoppen wenn wir einen neuen h3 Header erreichen
+                # (Textknoten haben den Tag "-text" und werden übersprungen)
+                if sibling.tag == 'h3':
+                    break
+                # Container mit Klasse "umgebend" sammeln
+                if sibling.tag == 'div' and 'umgebend' in (sibling.attributes.get('class') or '').split():
+                    forms_containers.append(sibling)
+                sibling = sibling.next
+            
+            # Es gibt nur einen Formen-Bereich, weitere Überschriften überspringen
+            break
         
         if not forms_containers:
             # Keine Formen gefunden - leere Liste cachen und zurückgeben
-            word_cache[cache_key] = []
+            word_cache.set(cache_key, [])
             return []
         
         # Container parsen
@@ -339,63 +628,112 @@ def lookup_word_all_meanings(word: str) -> List[dict]:
                 all_results.append(result)
         
         # Cache speichern
-        word_cache[cache_key] = all_results
+        word_cache.set(cache_key, all_results)
         return all_results
         
-    except requests.RequestException:
+    except (aiohttp.ClientError, asyncio.TimeoutError):
         return []
 
 
-def analyze_text(text: str, fetch_all_meanings: bool = True) -> list:
+def lookup_word_all_meanings(word: str) -> List[dict]:
+    """Synchrone Variante von lookup_word_all_meanings_async."""
+    return _run(lookup_word_all_meanings_async(word))
+
+
+@functools.lru_cache(maxsize=8192)
+def _memoized_lemma_keys(word: str) -> FrozenSet[str]:
+    """
+    Memoisierter Kern von get_lemma_keys.
+    
+    Schlägt die Abfrage fehl (leere Liste ohne Cache-Eintrag, z.B. Netzwerkfehler),
+    wird LookupError geworfen: lru_cache speichert nur Rückgabewerte, keine
+    Ausnahmen, sodass das Wort beim nächsten Aufruf erneut nachgeschlagen wird.
+    get_lemma_keys fängt den Fehler ab.
+    """
+    meanings = lookup_word_all_meanings(word)
+    if not meanings and word_cache.get(f"all_{word}") is None:
+        raise LookupError(word)
+    keys = {meaning['lemma_key'] for meaning in meanings if meaning.get('lemma_key')}
+    # Auch das Wort selbst hinzufügen
+    keys.add(normalize(word))
+    return frozenset(keys)
+
+
+def get_lemma_keys(word: str) -> FrozenSet[str]:
+    """
+    Liefert die normalisierten Grundformen eines Wortes (inkl. des Wortes selbst).
+    Ergebnisse werden prozessweit über Requests hinweg zwischengespeichert.
+    """
+    word = word.lower()
+    try:
+        return _memoized_lemma_keys(word)
+    except LookupError:
+        return frozenset({normalize(word)})
+
+
+async def _lookup_all_meanings_many(words: List[str]):
+    """Schlägt mehrere Wörter nebenläufig nach (Ergebnisse landen im word_cache)."""
+    await asyncio.gather(*(lookup_word_all_meanings_async(word) for word in words), return_exceptions=True)
+
+
+def get_lemma_keys_many(words: Iterable[str]) -> Dict[str, FrozenSet[str]]:
+    """
+    Wie get_lemma_keys für viele Wörter auf einmal (Schlüssel: kleingeschriebenes Wort).
+    Noch nicht gecachte Wörter werden vorab nebenläufig nachgeschlagen statt nacheinander.
+    """
+    words = {word.lower() for word in words}
+    missing = [word for word in words if word_cache.get(f"all_{word}") is None]
+    if missing:
+        _run(_lookup_all_meanings_many(missing))
+    
+    lemma_keys = {}
+    for word in words:
+        if word_cache.get(f"all_{word}") is None:
+            # Abfrage fehlgeschlagen - nicht erneut einzeln nachschlagen
+            lemma_keys[word] = frozenset({normalize(word)})
+        else:
+            lemma_keys[word] = get_lemma_keys(word)
+    return lemma_keys
+
+
+async def _analyze_async(unique_words: List[str], fetch_all_meanings: bool) -> dict:
+    """Schlägt alle Wörter nebenläufig nach und gibt {Wort: Bedeutungen} zurück."""
+    async def lookup(word):
+        if fetch_all_meanings:
+            return await lookup_word_all_meanings_async(word)
+        result = await lookup_word_async(word)
+        return [result] if result.get('found') else []
+    
+    tasks = [lookup(word) for word in unique_words]
+    word_results = await asyncio.gather(*tasks, return_exceptions=True)
+    
+    results_dict = {}
+    for word, result in zip(unique_words, word_results):
+        if result and not isinstance(result, BaseException):
+            results_dict[word] = result
+    return results_dict
+
+
+def analyze_text(text: str, fetch_all_meanings: bool = True, preprocessed: bool = False) -> list:
     """
     Analysiert einen lateinischen Text Wort für Wort.
-    Verwendet parallele Abfragen für maximale Geschwindigkeit.
+    Alle Abfragen laufen nebenläufig auf einem gemeinsamen Event-Loop.
     
     Args:
         text: Der zu analysierende lateinische Text
         fetch_all_meanings: Ob alle Bedeutungen für ambigue Wörter geholt werden sollen
+        preprocessed: Ob der Text bereits mit preprocess_text bereinigt wurde
     
     Returns:
         Liste von Wörterbucheinträgen für jedes Wort (nur Wörter mit Ergebnissen)
     """
-    text = preprocess_text(text)
-    words = re.findall(r'[a-zA-ZäöüÄÖÜāēīōūĀĒĪŌŪ]+', text.lower())
-    
-    # Deduplizieren und filtern
-    unique_words = []
-    seen = set()
-    for word in words:
-        if word not in seen and len(word) >= 2:
-            seen.add(word)
-            unique_words.append(word)
+    if not preprocessed:
+        text = preprocess_text(text)
+    # Deduplizieren und filtern (dict erhält die Reihenfolge des ersten Vorkommens)
+    unique_words = list(dict.fromkeys(word for word in tokenize(text) if len(word) >= 2))
     
-    # Parallele Abfragen mit ThreadPoolExecutor
-    results_dict = {}
-    
-    def lookup_word_wrapper(word):
-        if fetch_all_meanings:
-            return word, lookup_word_all_meanings(word)
-        else:
-            result = lookup_word(word)
-            return word, [result] if result.get('found') else []
-    
-    # Maximale Parallelität - so viele Threads wie Wörter (bis zu 50)
-    max_workers = min(len(unique_words), 50)
-    
-    if max_workers > 0:
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(lookup_word_wrapper, word): word for word in unique_words}
-            
-            for future in as_completed(futures):
-                try:
-                    word, word_results = future.result()
-                    if word_results:
-                        results_dict[word] = word_results
-                except Exception:
-                    pass
-    
-    # Cache periodisch speichern
-    save_cache()
+    # Nebenläufige Abfragen (begrenzt durch die Semaphore in fetch_page)
+    results_dict = _run(_analyze_async(unique_words, fetch_all_meanings)) if unique_words else {}
     
     # Ergebnisse in der ursprünglichen Reihenfolge zurückgeben
     results = []